@@ -28,7 +28,8 @@ USAGE
 
 REQUIREMENTS
 ------------
-Python 3.7+, standard library only (urllib, json, math, time, sys, os).
+Python 3.7+, standard library only (urllib, json, time, sys, os), plus
+osm_common.py from this directory.
 Outbound HTTPS access to nominatim.openstreetmap.org and overpass-api.de.
 Nominatim rate limit: 1 req/sec (enforced automatically).
 """
@@ -37,11 +38,12 @@ import sys
 import os
 import time
 import json
-import math
 import urllib.request
 import urllib.parse
 import urllib.error
 
+from osm_common import TeeWriter
+
 # ── Israel + West Bank bounding box ─────────────────────────────────────────
 # Nominatim viewbox format: left(lon_min), top(lat_max), right(lon_max), bottom(lat_min)
 NOMINATIM_VIEWBOX = "34.0,33.5,36.0,29.0"
@@ -59,29 +61,6 @@ ARAB_HEB_PREFIXES = ["אבו "]                               # Abu...
 ARAB_ENG_PREFIXES = ["Abu ", "Al ", "Al-", "Kafr ", "Bir ", "Umm ", "Um "]
 
 
-class TeeWriter:
-    """Write to both stdout and a log file simultaneously."""
-    def __init__(self, logfile, original_stdout):
-        self.logfile = logfile
-        self.stdout  = original_stdout
-    def write(self, text):
-        self.stdout.write(text)
-        self.logfile.write(text)
-    def flush(self):
-        self.stdout.flush()
-        self.logfile.flush()
-
-
-def haversine_km(lat1, lng1, lat2, lng2):
-    R = 6371
-    dlat = math.radians(lat2 - lat1)
-    dlng = math.radians(lng2 - lng1)
-    a = (math.sin(dlat / 2) ** 2
-         + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2))
-         * math.sin(dlng / 2) ** 2)
-    return R * 2 * math.asin(math.sqrt(a))
-
-
 def is_arab(entry):
     heb = entry.get("Hebrew Name", "")
     eng = entry.get("English Name", "")
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Helpers shared by the coordinate pipeline scripts (validate_coords.py,
+fetch_osm_coordinates.py, sync_towns_coords.py).
+
+Standard library only, like the scripts that import it.
+"""
+
+from math import atan2, cos, pi, sin, sqrt
+
+_DEG = pi / 180.0  # degrees → radians
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    R = 6371
+    dlat = (lat2 - lat1) * _DEG
+    dlng = (lng2 - lng1) * _DEG
+    a = sin(dlat/2)**2 + cos(lat1 * _DEG)*cos(lat2 * _DEG)*sin(dlng/2)**2
+    return R * 2 * atan2(sqrt(a), sqrt(1 - a))
+
+class TeeWriter:
+    """Write to both stdout and a log file simultaneously."""
+    def __init__(self, logfile, original_stdout):
+        self.logfile = logfile
+        self.stdout = original_stdout
+    def write(self, text):
+        self.stdout.write(text)
+        self.logfile.write(text)
+    def flush(self):
+        self.stdout.flush()
+        self.logfile.flush()
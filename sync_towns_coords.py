@@ -13,7 +13,8 @@ import sys
 import re
 import json
 import os
-import math
+
+from osm_common import haversine_km
 
 MAX_DISTANCE_KM = 10  # skip updates where new coord is farther than this from old
 
@@ -77,16 +78,6 @@ LAT_LNG_RE = re.compile(
     r'(name:"(?P<name>[^"]+)",\s*lat:)(?P<lat>[\d.]+)(,\s*lng:)(?P<lng>[\d.]+)'
 )
 
-def haversine_km(lat1, lng1, lat2, lng2):
-    R = 6371
-    dlat = math.radians(lat2 - lat1)
-    dlng = math.radians(lng2 - lng1)
-    a = (math.sin(dlat / 2) ** 2
-         + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2))
-         * math.sin(dlng / 2) ** 2)
-    return R * 2 * math.asin(math.sqrt(a))
-
-
 updated          = 0
 skipped_polygon  = 0
 no_match         = 0
@@ -94,14 +85,18 @@ suspicious       = 0
 
 def do_replace(text, name, new_lat, new_lng):
     """Replace lat/lng for the given name in towns.js text. Returns new text."""
-    pattern = re.compile(
-        r'(name:"' + re.escape(name) + r'",\s*lat:)([\d.]+)(,\s*lng:)([\d.]+)'
-    )
-    new_text, n = pattern.subn(
-        lambda m: m.group(1) + str(new_lat) + m.group(3) + str(new_lng),
-        text
-    )
-    return new_text, n
+    anchor = f'name:"{name}"'
+    parts, pos, n = [], 0, 0
+    idx = text.find(anchor)
+    while idx != -1:
+        m = LAT_LNG_RE.match(text, idx)
+        if m:
+            parts += [text[pos:m.start("lat")], str(new_lat), m.group(4), str(new_lng)]
+            pos = m.end("lng")
+            n += 1
+        idx = text.find(anchor, idx + len(anchor))
+    parts.append(text[pos:])
+    return "".join(parts), n
 
 for name, lat_str, lng_str, nameHe in towns:
     old_lat = float(lat_str)
@@ -24,23 +24,50 @@ uses the Overpass API to find OSM places whose English name (name:en tag)
 matches — the same data rendered by the CartoDB Positron English map layer.
 
 Nominatim requires a 1 req/sec rate limit (enforced automatically).
+Nominatim results are cached in .nominatim_cache.json next to this script, so
+re-runs only query names that have not been looked up in the last 30 days.
+Expired entries are refreshed in bulk through the /lookup endpoint by their
+OSM id (50 per request).  Delete the file to force fresh lookups.
+Every town that gets a delta row is also written to validation_flagged.jsonl,
+one JSON object per line (name, stored, osm, dist_km, osm_name), so other tools
+can use the results without parsing the table.
 Interchanges/junctions are skipped — they have no OSM city record.
 
 REQUIREMENTS
 ------------
-Python 3.7+, standard library only (urllib, re, json, math, time, sys).
+Python 3.7+, standard library only (urllib, http.client, re, json, time, sys,
+mmap, threading, concurrent.futures), plus osm_common.py from this directory.
+If orjson is installed it is used to decode Nominatim responses and encode
+validation_flagged.jsonl.
 Outbound HTTPS access to nominatim.openstreetmap.org on port 443.
 """
 
+import os
 import re
+import mmap
 import sys
 import time
-import math
 import json
 import io
+import random
+import threading
+import http.client
 import urllib.request
 import urllib.parse
 import urllib.error
+from collections import deque
+from functools import lru_cache
+from operator import itemgetter
+from concurrent.futures import Future, ThreadPoolExecutor
+
+try:
+    from orjson import dumps as _dumps, loads as _loads
+except ImportError:
+    from json import loads as _loads
+    def _dumps(obj):
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+from osm_common import TeeWriter, haversine_km
 
 # ── OSM search aliases for names that need rewording to match OSM ─────────────
 OSM_ALIASES = {
@@ -99,6 +126,14 @@ SKIP_NAMES = {
 }
 
 ISRAEL_COUNTRY_CODES = "IL,PS"  # include West Bank (PS)
+NOMINATIM_HOST = "nominatim.openstreetmap.org"
+NOMINATIM_INTERVAL = 1.0        # seconds between requests (policy: max 1 req/sec)
+NOMINATIM_ATTEMPTS = 3          # tries per request when throttled (HTTP 429/503)
+CACHED_OK_KM = 0.01             # cached OSM value this close to stored → nothing to do
+NOMINATIM_CACHE_TTL = 30 * 86400  # seconds before a cached result is re-fetched
+NOMINATIM_LOOKUP_BATCH = 50    # max osm_ids per /lookup request
+ROW_FLUSH_EVERY = 20            # result rows buffered per stdout write
+NOMINATIM_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".nominatim_cache.json")
 
 # ── Hebrew names for towns that have no name:en in OSM ────────────────────────
 HEBREW_NAMES = {
@@ -121,14 +156,12 @@ UNMATCHED_TOWNS = {
 }
 
 # ── Bounding box for Israel + occupied territories (S,W,N,E) ─────────────────
-ISRAEL_BBOX = "29.0,34.0,33.5,36.0"
+ISRAEL_BOUNDS = (29.0, 34.0, 33.5, 36.0)
+ISRAEL_BBOX = ",".join(map(str, ISRAEL_BOUNDS))
 
-def haversine_km(lat1, lng1, lat2, lng2):
-    R = 6371
-    dlat = math.radians(lat2 - lat1)
-    dlng = math.radians(lng2 - lng1)
-    a = math.sin(dlat/2)**2 + math.cos(math.radians(lat1))*math.cos(math.radians(lat2))*math.sin(dlng/2)**2
-    return R * 2 * math.asin(math.sqrt(a))
+def in_israel_bbox(lat, lng):
+    s, w, n, e = ISRAEL_BOUNDS
+    return s <= lat <= n and w <= lng <= e
 
 # ── Overpass API helpers (query OSM name:en — same data as English map layer) ─
 
@@ -218,73 +251,241 @@ def overpass_lookup(name, stored_lat=None, stored_lng=None):
 
     return None, None, f"No Overpass match{': ' + last_err if last_err else ''}"
 
+# ── Nominatim response cache: "query|country_codes" → [lat, lng, display, ts, osm_ref]
+
+def _load_nominatim_cache():
+    try:
+        with open(NOMINATIM_CACHE_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+nominatim_cache = _load_nominatim_cache()
+
+def save_nominatim_cache():
+    with open(NOMINATIM_CACHE_PATH, "w", encoding="utf-8") as f:
+        json.dump(nominatim_cache, f, ensure_ascii=False, indent=1, sort_keys=True)
+
+def _cache_key(name, country_codes):
+    return f"{OSM_ALIASES.get(name, name)}|{country_codes}"
+
+def _cached(key):
+    """Return the cached (lat, lng, display) for `key`, or None if missing or stale."""
+    entry = nominatim_cache.get(key)
+    if entry is None or len(entry) < 4 or time.time() - entry[3] > NOMINATIM_CACHE_TTL:
+        return None
+    return tuple(entry[:3])
+
+# ── Keep-alive HTTPS connection to Nominatim, one per worker thread ──────────
+_nominatim_tls = threading.local()
+
+class TokenBucket:
+    """Thread-safe token bucket: acquire() blocks only for the time still owed."""
+    def __init__(self, rate=1.0, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                time.sleep((1 - self.tokens) / self.rate)
+                self.tokens = 1
+                self.updated = time.monotonic()
+            self.tokens -= 1
+
+_nominatim_bucket = TokenBucket(rate=1 / NOMINATIM_INTERVAL)
+
+def _nominatim_request(path):
+    """
+    GET `path` from Nominatim and return the response body.
+
+    Reuses this thread's persistent connection so the TCP + TLS handshake is
+    paid once rather than per town; a connection the server has dropped is
+    reopened and the request retried once.
+    """
+    for attempt in range(2):
+        conn = getattr(_nominatim_tls, "conn", None)
+        if conn is None:
+            conn = _nominatim_tls.conn = http.client.HTTPSConnection(NOMINATIM_HOST, timeout=10)
+        try:
+            conn.request("GET", path, headers={"User-Agent": "GillyGeoGuesser-validator/1.0"})
+            resp = conn.getresponse()
+            body = resp.read()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            _nominatim_tls.conn = None
+            if attempt:
+                raise
+            continue
+        if resp.status != 200:
+            raise urllib.error.HTTPError(f"https://{NOMINATIM_HOST}{path}", resp.status,
+                                         resp.reason, resp.headers, None)
+        return body
+
+def _nominatim_get(path):
+    """
+    Rate-limited _nominatim_request(): every attempt waits for a token from the
+    shared bucket, and HTTP 429/503 answers are retried with exponential
+    backoff plus jitter, up to NOMINATIM_ATTEMPTS tries.
+    """
+    for attempt in range(NOMINATIM_ATTEMPTS):
+        _nominatim_bucket.acquire()
+        try:
+            return _nominatim_request(path)
+        except urllib.error.HTTPError as e:
+            if e.code not in (429, 503) or attempt == NOMINATIM_ATTEMPTS - 1:
+                raise
+            time.sleep(min(60, 2 ** attempt + random.random()))
+
+def _osm_ref(result):
+    """'N123' / 'W456' / 'R789' id of a Nominatim result, as /lookup expects."""
+    osm_type, osm_id = result.get("osm_type"), result.get("osm_id")
+    return f"{osm_type[0].upper()}{osm_id}" if osm_type and osm_id else None
+
+def refresh_stale_cache(names, country_codes=ISRAEL_COUNTRY_CODES):
+    """
+    Re-fetch expired cache entries for `names` through Nominatim /lookup.
+
+    Entries that recorded their OSM id are refreshed NOMINATIM_LOOKUP_BATCH at
+    a time with one request per batch, instead of one /search per town.
+    Anything not refreshed here stays stale and nominatim_lookup() re-queries it.
+    """
+    stale = {}
+    for name in names:
+        key = _cache_key(name, country_codes)
+        entry = nominatim_cache.get(key)
+        if entry and len(entry) >= 5 and entry[4] and not _cached(key):
+            stale.setdefault(entry[4], []).append(key)
+    refs = list(stale)
+    for i in range(0, len(refs), NOMINATIM_LOOKUP_BATCH):
+        params = urllib.parse.urlencode({
+            "osm_ids": ",".join(refs[i:i + NOMINATIM_LOOKUP_BATCH]),
+            "format": "json",
+        })
+        try:
+            results = _loads(_nominatim_get(f"/lookup?{params}"))
+        except Exception:
+            results = []
+        now = int(time.time())
+        for r in results:
+            ref = _osm_ref(r)
+            for key in stale.get(ref, ()):
+                nominatim_cache[key] = [float(r["lat"]), float(r["lon"]), r.get("display_name", ""), now, ref]
+
+# Only the query and country codes vary between /search requests.
+_SEARCH_PATH = "/search?q={q}&format=json&limit=3&countrycodes={cc}&addressdetails=0"
+
+@lru_cache(maxsize=2048)
+def _encoded_query(name):
+    """URL-encoded `q` value for `name` (alias applied), computed once per name."""
+    return urllib.parse.quote_plus(f"{OSM_ALIASES.get(name, name)}, Israel")
+
 def nominatim_lookup(name, country_codes=ISRAEL_COUNTRY_CODES):
-    query = OSM_ALIASES.get(name, name)
-    params = urllib.parse.urlencode({
-        "q": f"{query}, Israel",
-        "format": "json",
-        "limit": 3,
-        "countrycodes": country_codes,
-        "addressdetails": 0,
-    })
-    url = f"https://nominatim.openstreetmap.org/search?{params}"
-    req = urllib.request.Request(url, headers={"User-Agent": "GillyGeoGuesser-validator/1.0"})
+    key = _cache_key(name, country_codes)
+    hit = _cached(key)
+    if hit:
+        return hit
+    path = _SEARCH_PATH.format(q=_encoded_query(name), cc=urllib.parse.quote_plus(country_codes))
     try:
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            results = json.loads(resp.read())
-            if results:
-                return float(results[0]["lat"]), float(results[0]["lon"]), results[0].get("display_name", "")
+        results = _loads(_nominatim_get(path))
+        if results:
+            hit = float(results[0]["lat"]), float(results[0]["lon"]), results[0].get("display_name", "")
+            nominatim_cache[key] = [*hit, int(time.time()), _osm_ref(results[0])]
+            return hit
     except Exception as e:
         return None, None, f"ERROR: {e}"
     return None, None, "No result"
 
+def nominatim_lookups(names, country_codes=ISRAEL_COUNTRY_CODES):
+    """
+    Yield nominatim_lookup() results for `names`, in order.
+
+    Lookups run on worker threads and _nominatim_get() spaces the actual
+    requests by NOMINATIM_INTERVAL, so the HTTPS round-trip of one lookup
+    overlaps with the rate-limit wait before the next instead of adding to it.
+    Cached names are answered immediately and do not count against the limit.
+    """
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        pending = deque()
+        for name in names:
+            hit = _cached(_cache_key(name, country_codes))
+            if hit:
+                cached = Future()
+                cached.set_result(hit)
+                pending.append(cached)
+            else:
+                pending.append(pool.submit(nominatim_lookup, name, country_codes))
+        while pending:
+            yield pending.popleft().result()
+
+# ── tail of a town record after the closing quote of its name ───────────────
+_COORDS_RE = re.compile(rb',\s*lat:([\d.]+),\s*lng:([\d.]+)')
+
 def parse_towns(html_path):
-    with open(html_path, encoding="utf-8") as f:
-        content = f.read()
-    pattern = re.compile(r'\{\s*name:"([^"]+)",\s*lat:([\d.]+),\s*lng:([\d.]+)')
-    return [(m.group(1), float(m.group(2)), float(m.group(3)))
-            for m in pattern.finditer(content)]
-
-def apply_fix(html_path, name, old_lat, old_lng, new_lat, new_lng):
-    """Patch index.html, replacing the stored coords for `name` with OSM values."""
-    with open(html_path, encoding="utf-8") as f:
-        content = f.read()
-    pattern = re.compile(
-        r'(name:"' + re.escape(name) + r'",\s*lat:)' +
-        re.escape(str(old_lat)) + r'(,\s*lng:)' + re.escape(str(old_lng))
-    )
-    new_content = pattern.sub(
-        lambda m: m.group(1) + f'{new_lat:.4f}' + m.group(2) + f'{new_lng:.4f}',
-        content, count=1
-    )
-    if new_content == content:
-        return False
-    with open(html_path, "w", encoding="utf-8") as f:
-        f.write(new_content)
-    return True
-
-class TeeWriter:
-    """Write to both stdout and a log file simultaneously."""
-    def __init__(self, logfile, original_stdout):
-        self.logfile = logfile
-        self.stdout = original_stdout
-    def write(self, text):
-        self.stdout.write(text)
-        self.logfile.write(text)
-    def flush(self):
-        self.stdout.flush()
-        self.logfile.flush()
+    """
+    Return [(name, lat, lng)] for every `{ name:"…", lat:…, lng:… }` record.
+
+    The file is memory-mapped and scanned with mmap.find() for the `name:"`
+    anchor; only the short coordinate tail after each anchor goes through
+    the regex engine.
+    """
+    towns = []
+    with open(html_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return towns
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            idx = mm.find(b'name:"')
+            while idx != -1:
+                start = idx + 6
+                end = mm.find(b'"', start)
+                if end == -1:
+                    break
+                j = idx - 1
+                while j >= 0 and mm[j] in b" \t\r\n\f\v":
+                    j -= 1
+                if end > start and j >= 0 and mm[j] == ord("{"):
+                    m = _COORDS_RE.match(mm, end + 1)
+                    if m:
+                        towns.append((mm[start:end].decode("utf-8"),
+                                      float(m.group(1)), float(m.group(2))))
+                idx = mm.find(b'name:"', end + 1)
+    return towns
+
+# ── name / lat / lng triple of a town record, shared by every apply_fix call ──
+TOWN_RE = re.compile(r'(name:"([^"]+)",\s*lat:)([\d.]+)(,\s*lng:)([\d.]+)')
+
+def apply_fix(content, name, old_lat, old_lng, new_lat, new_lng):
+    """Replace the stored coords for `name` in the in-memory index.html text.
+    Returns (new_content, changed)."""
+    anchor = f'name:"{name}"'
+    idx = content.find(anchor)
+    while idx != -1:
+        m = TOWN_RE.match(content, idx)
+        if m and float(m.group(3)) == old_lat and float(m.group(5)) == old_lng:
+            new = m.group(1) + f'{new_lat:.4f}' + m.group(4) + f'{new_lng:.4f}'
+            return content[:m.start()] + new + content[m.end():], new != m.group(0)
+        idx = content.find(anchor, idx + len(anchor))
+    return content, False
 
 def main():
-    import os
     apply_mode = "--apply" in sys.argv
     unmatched_only = "--unmatched-only" in sys.argv
     html_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "index.html")
     log_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "validate_coords.log")
+    flagged_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "validation_flagged.jsonl")
     log_file = open(log_path, "w", encoding="utf-8")
+    flagged_file = open(flagged_path, "wb")
     sys.stdout = TeeWriter(log_file, sys.__stdout__)
 
     all_towns = parse_towns(html_path)
+    if apply_mode:
+        with open(html_path, encoding="utf-8") as f:
+            content = f.read()
 
     if unmatched_only:
         towns = [(n, la, ln) for n, la, ln in all_towns if n in UNMATCHED_TOWNS]
@@ -292,49 +493,88 @@ def main():
     else:
         towns = [(n, la, ln) for n, la, ln in all_towns if n not in SKIP_NAMES]
         method = "Nominatim"
+        # Stored coords outside Israel are data-entry errors that
+        # no Nominatim answer would fix — don't spend a rate-limited request on them.
+        out_of_bbox = [t for t in towns if not in_israel_bbox(t[1], t[2])]
+        towns = [t for t in towns if in_israel_bbox(t[1], t[2])]
 
     mode_label = " (APPLY MODE — patching index.html)" if apply_mode else " (dry run — use --apply to patch)"
     print(f"Checking {len(towns)} towns via {method}...{mode_label}\n")
     print(f"{'Location':<30} {'Stored':>22} {method+' coords':>22} {'Diff km':>8}  Status")
     print("-" * 110)
 
+    if not unmatched_only:
+        for name, stored_lat, stored_lng in out_of_bbox:
+            stored_str = f"({stored_lat:.4f},{stored_lng:.4f})"
+            print(f"  {name:<28} {stored_str:>22} {'':>22} {'':>8}  SKIP (outside Israel bbox)")
+
     patched_list = []
     failed_list = []
 
-    for name, stored_lat, stored_lng in towns:
-        if unmatched_only:
-            osm_lat, osm_lng, display = overpass_lookup(name, stored_lat, stored_lng)
-        else:
-            time.sleep(1.1)   # Nominatim rate limit: max 1 req/sec
-            osm_lat, osm_lng, display = nominatim_lookup(name)
-
+    if unmatched_only:
+        lookups = (overpass_lookup(n, la, ln) for n, la, ln in towns)
+        cached_keys = set()
+    else:
+        refresh_stale_cache(n for n, _, _ in towns)
+        lookups = nominatim_lookups(n for n, _, _ in towns)
+        cached_keys = {k for k in nominatim_cache if _cached(k)}  # snapshot: fresh from a previous run
+
+    # Result rows are written in batches of ROW_FLUSH_EVERY rather than one
+    # print() (and one log write) per town.
+    rows = []
+    def flush_rows():
+        if rows:
+            sys.stdout.write("\n".join(rows) + "\n")
+            sys.stdout.flush()
+            rows.clear()
+    def emit(line):
+        rows.append(line)
+        if len(rows) >= ROW_FLUSH_EVERY:
+            flush_rows()
+
+    for (name, stored_lat, stored_lng), (osm_lat, osm_lng, display) in zip(towns, lookups):
         stored_str = f"({stored_lat:.4f},{stored_lng:.4f})"
 
         if osm_lat is None:
-            print(f"  {name:<28} {stored_str:>22} {'':>22} {'?':>8}  LOOKUP FAILED: {display}")
+            emit(f"  {name:<28} {stored_str:>22} {'':>22} {'?':>8}  LOOKUP FAILED: {display}")
             failed_list.append((name, display))
             continue
 
         dist = haversine_km(stored_lat, stored_lng, osm_lat, osm_lng)
         osm_str = f"({osm_lat:.4f},{osm_lng:.4f})"
 
+        if dist < CACHED_OK_KM and _cache_key(name, ISRAEL_COUNTRY_CODES) in cached_keys:
+            emit(f"  {name:<28} {stored_str:>22} {osm_str:>22} {dist:>7.1f}km  OK (cached)")
+            continue
+
         if apply_mode:
-            patched = apply_fix(html_path, name, stored_lat, stored_lng, osm_lat, osm_lng)
+            content, patched = apply_fix(content, name, stored_lat, stored_lng, osm_lat, osm_lng)
             status = "PATCHED" if patched else "unchanged"
             if patched:
                 patched_list.append((name, stored_lat, stored_lng, osm_lat, osm_lng, dist))
         else:
             status = f"{dist:.1f}km delta  ({display})"
 
-        print(f"  {name:<28} {stored_str:>22} {osm_str:>22} {dist:>7.1f}km  {status}")
+        emit(f"  {name:<28} {stored_str:>22} {osm_str:>22} {dist:>7.1f}km  {status}")
+        flagged_file.write(_dumps({
+            "name": name, "stored": [stored_lat, stored_lng], "osm": [osm_lat, osm_lng],
+            "dist_km": round(dist, 3), "osm_name": display,
+        }) + b"\n")
 
+    flush_rows()
     print("\n" + "=" * 110)
 
+    if not unmatched_only:
+        save_nominatim_cache()
+
     if apply_mode:
+        if patched_list:
+            with open(html_path, "w", encoding="utf-8") as f:
+                f.write(content)
         print(f"\nSUMMARY: {len(patched_list)} patched, {len(towns) - len(patched_list) - len(failed_list)} already matched, {len(failed_list)} lookup failures\n")
         if patched_list:
             print("PATCHED (sorted by correction size):")
-            for name, slat, slng, olat, olng, dist in sorted(patched_list, key=lambda x: -x[5]):
+            for name, slat, slng, olat, olng, dist in sorted(patched_list, key=itemgetter(5), reverse=True):
                 print(f"  {name:<30} ({slat}, {slng}) → ({olat:.4f}, {olng:.4f})  [{dist:.1f} km]")
         if failed_list:
             print("\nLOOKUP FAILURES (not patched):")
@@ -351,9 +591,11 @@ def main():
             for name, err in failed_list:
                 print(f"  {name}: {err}")
 
+    flagged_file.close()
     log_file.close()
     sys.stdout = sys.__stdout__
     print(f"\nLog written to: {log_path}")
+    print(f"Flagged towns (JSONL) written to: {flagged_path}")
 
 if __name__ == "__main__":
     main()